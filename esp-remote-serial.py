@@ -6,20 +6,49 @@ and launches esp_rfc2217_server as a child process.
 """
 
 import argparse
+import codecs
 import importlib
+import importlib.util
+import io
+import operator
 import os
 import platform
+import queue
+import selectors
+import shlex
+import signal
 import subprocess
 import sys
 import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
 
-REQUIRED_PACKAGES = {
-    # import_name -> pip_name
+# platform.system() doesn't change at runtime - look it up once
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+_IS_DARWIN = _SYSTEM == "Darwin"
+_IS_LINUX = _SYSTEM == "Linux"
+
+# Serial port scan results are reused for this long (seconds) so rapid
+# Refresh clicks don't re-enumerate sysfs / SetupAPI every time.
+PORT_CACHE_TTL = 0.5
+# An explicit Refresh click still reuses a scan younger than this.
+PORT_CACHE_FORCE_TTL = 0.1
+
+_port_cache: tuple[float, list] | None = None
+
+# An empty lock file younger than this (seconds) belongs to an instance
+# that is still between creating the file and writing its PID.
+LOCK_CREATE_GRACE = 5.0
+
+# import_name -> pip_name
+# Needed by the GUI process itself (checked before the window opens)
+GUI_REQUIRED = {
     "serial": "pyserial",
+}
+# Only needed by the esp_rfc2217_server child (checked when Start is clicked)
+RUNTIME_REQUIRED = {
     "esptool": "esptool",
-    "psutil": "psutil",
 }
 
 
@@ -29,77 +58,196 @@ def get_lock_file_path(tcp_port: int) -> str:
     return os.path.join(script_dir, f".esp-serial-tcp{tcp_port}.lock")
 
 
+def _unlink_quietly(path: str):
+    """Remove a file with a single syscall, ignoring it if already gone."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass  # FileNotFoundError included - someone else cleaned it up
+
+
 def is_process_running(pid: int) -> bool:
     """Check if a process with given PID is running."""
+    if pid <= 0:
+        return False
+
+    if _IS_WINDOWS:
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        ERROR_ACCESS_DENIED = 5
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Process exists but we may not query it (like PermissionError below)
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return False
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
     try:
-        import psutil
-        return psutil.pid_exists(pid)
-    except ImportError:
-        # Fallback if psutil not available yet
+        os.kill(pid, 0)
+    except ProcessLookupError:
         return False
+    except PermissionError:
+        # Process exists but belongs to another user
+        return True
+    return True
+
+
+def _process_start_time(pid: int) -> str | None:
+    """Return a process's start time (Linux /proc/<pid>/stat field 22), if available.
+
+    Stored next to the PID in lock files so a recycled PID isn't mistaken
+    for the instance that wrote the lock.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # comm (field 2) may contain spaces - fields after it start at field 3
+    fields = stat.rpartition(")")[2].split()
+    return fields[19] if len(fields) > 19 else None
 
 
 def check_existing_instance(tcp_port: int) -> bool:
     """Check if an instance is already running for this TCP port. Returns True if found."""
     lock_file = get_lock_file_path(tcp_port)
     
-    if not os.path.exists(lock_file):
-        return False
-    
     try:
         with open(lock_file, 'r') as f:
             pid_str = f.read().strip()
             if not pid_str:
+                # Either another instance is between its O_EXCL create and
+                # its write, or a crash left the file empty
+                if time.time() - os.fstat(f.fileno()).st_mtime < LOCK_CREATE_GRACE:
+                    print(f"ESP32 Remote Serial GUI is starting for TCP port {tcp_port}")
+                    return True
+                _unlink_quietly(lock_file)
                 return False
             
+            pid_str, _, start_time = pid_str.partition(":")
             pid = int(pid_str)
-            if is_process_running(pid):
+            if is_process_running(pid) and (
+                not start_time or _process_start_time(pid) in (None, start_time)
+            ):
                 print(f"ESP32 Remote Serial GUI already running for TCP port {tcp_port} (PID: {pid})")
                 return True
             else:
-                # Stale lock file - remove it
-                os.remove(lock_file)
+                # Stale lock file (dead, or PID reused by another process) - remove it
+                _unlink_quietly(lock_file)
                 return False
+    except FileNotFoundError:
+        return False
     except (ValueError, OSError):
         # Invalid or inaccessible lock file - remove it
-        try:
-            os.remove(lock_file)
-        except OSError:
-            pass
+        _unlink_quietly(lock_file)
         return False
 
 
-def write_lock_file(tcp_port: int):
-    """Write the current process PID to the lock file for a specific TCP port."""
+def write_lock_file(tcp_port: int) -> bool | None:
+    """Atomically create the lock file for a TCP port with the current PID.
+
+    Returns True if this process now owns the lock, False if another live
+    instance already holds it, and None if no lock could be taken (startup
+    continues unprotected, and the file must not be removed on exit).
+    """
     lock_file = get_lock_file_path(tcp_port)
-    try:
-        with open(lock_file, 'w') as f:
-            f.write(str(os.getpid()))
-    except OSError:
-        pass  # Non-critical if we can't write the lock
+    for _ in range(2):
+        try:
+            # O_EXCL makes create-if-absent a single atomic step
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if check_existing_instance(tcp_port):
+                return False
+            continue  # Stale lock was removed - retry once
+        except OSError:
+            return None  # Non-critical if we can't write the lock
+        pid = os.getpid()
+        start_time = _process_start_time(pid)
+        content = f"{pid}:{start_time}" if start_time else str(pid)
+        try:
+            os.write(fd, content.encode())
+        finally:
+            os.close(fd)
+        return True
+    return None  # Lost a race on a stale lock twice - don't block startup
 
 
 def cleanup_lock_file(tcp_port: int | None):
     """Remove the lock file for a specific TCP port."""
     if tcp_port is None:
         return
-    lock_file = get_lock_file_path(tcp_port)
+    _unlink_quietly(get_lock_file_path(tcp_port))
+
+
+def get_deps_marker_path() -> str:
+    """Get the marker file recording that dependencies are satisfied."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    return os.path.join(script_dir, f".deps-ok-py{version}")
+
+
+def _read_deps_marker() -> set[str]:
+    """Return the package names a previous run verified for this interpreter."""
     try:
-        if os.path.exists(lock_file):
-            os.remove(lock_file)
+        with open(get_deps_marker_path(), 'r') as f:
+            prefix, _, names = f.read().partition("\n")
     except OSError:
-        pass
+        return set()
+    # Tie the marker to this interpreter - another venv may share the script
+    if prefix != sys.prefix:
+        return set()
+    return set(filter(None, names.split(",")))
 
 
-def ensure_dependencies() -> list[str]:
-    """Check for missing packages and install them. Returns list of errors."""
-    missing: list[tuple[str, str]] = []
-    for import_name, pip_name in REQUIRED_PACKAGES.items():
-        try:
-            importlib.import_module(import_name)
-        except ImportError:
-            missing.append((import_name, pip_name))
+def _write_deps_marker(packages: dict[str, str]):
+    recorded = _read_deps_marker()
+    if set(packages) <= recorded:
+        return
+    satisfied = recorded | set(packages)
+    try:
+        with open(get_deps_marker_path(), 'w') as f:
+            f.write(f"{sys.prefix}\n{','.join(sorted(satisfied))}")
+    except OSError:
+        pass  # Non-critical - we'll just probe again next time
+
 
+def missing_dependencies(
+    packages: dict[str, str], trust_marker: bool = True, record: bool = True
+) -> list[tuple[str, str]]:
+    """Return (import_name, pip_name) for each package that isn't installed.
+
+    A clean probe is recorded in the deps marker (unless record=False) so
+    warm starts can skip it.
+    """
+    if trust_marker and set(packages) <= _read_deps_marker():
+        return []
+    # find_spec() only locates the package - it doesn't execute it
+    missing = [
+        (import_name, pip_name)
+        for import_name, pip_name in packages.items()
+        if importlib.util.find_spec(import_name) is None
+    ]
+    if not missing and record:
+        _write_deps_marker(packages)
+    return missing
+
+
+def ensure_dependencies(
+    packages: dict[str, str], verify_import: bool = True, trust_marker: bool = True
+) -> list[str]:
+    """Check for missing packages and install them. Returns list of errors.
+
+    With verify_import=False a freshly installed package is only located,
+    not imported - for packages the GUI never imports itself.
+    """
+    missing = missing_dependencies(packages, trust_marker)
     if not missing:
         return []
 
@@ -116,44 +264,165 @@ def ensure_dependencies() -> list[str]:
         return [f"pip install failed:\n{result.stderr}"]
 
     # Verify imports work after install
+    importlib.invalidate_caches()
     errors: list[str] = []
     for import_name, pip_name in missing:
         try:
-            importlib.import_module(import_name)
+            if verify_import:
+                importlib.import_module(import_name)
+            elif importlib.util.find_spec(import_name) is None:
+                raise ImportError(import_name)
         except ImportError:
             errors.append(f"Failed to import '{import_name}' after installing '{pip_name}'.")
+    if not errors:
+        _write_deps_marker(packages)
     return errors
 
 
+def run_in_background(widget: tk.Misc, func, on_done, poll_ms: int = 100):
+    """Run func() in a worker thread and call on_done(result) on the Tk thread."""
+    result: list = []
+    thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    thread.start()
+
+    def _poll():
+        if thread.is_alive():
+            widget.after(poll_ms, _poll)
+        else:
+            on_done(result[0] if result else None)
+    widget.after(poll_ms, _poll)
+
+
+def _linux_pipe_size(wanted: int) -> int:
+    """Clamp a pipe size to the unprivileged limit so Popen can't fail on it."""
+    try:
+        with open("/proc/sys/fs/pipe-max-size", 'r') as f:
+            return min(wanted, int(f.read()))
+    except (OSError, ValueError):
+        return -1  # Let Popen keep the default size
+
+
+# Last pyserial scan on Windows, keyed by the registry's COM port set
+_windows_scan: tuple[frozenset[str], list] | None = None
+
+
+def _registry_com_names() -> frozenset[str]:
+    """Return the present COM port names from the SERIALCOMM device map (Windows only).
+
+    A handful of registry calls - cheap enough to tell whether pyserial's
+    SetupAPI walk needs to run again. Raises OSError if the key can't be read.
+    """
+    import winreg
+    names = set()
+    try:
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DEVICEMAP\SERIALCOMM")
+    except FileNotFoundError:
+        return frozenset()  # Key only exists while at least one port is present
+    with key:
+        idx = 0
+        while True:
+            try:
+                _name, device, _ = winreg.EnumValue(key, idx)
+            except OSError:
+                break  # ERROR_NO_MORE_ITEMS
+            names.add(device)
+            idx += 1
+    return frozenset(names)
+
+
+def _scan_ports() -> list:
+    """Enumerate serial ports, sorted by device name."""
+    global _windows_scan  # noqa: PLW0603
+    devices = None
+    if _IS_WINDOWS:
+        try:
+            devices = _registry_com_names()
+        except OSError:
+            pass  # Always do the full pyserial scan
+        # Same COM ports as last time - reuse pyserial's descriptions
+        if devices is not None and _windows_scan is not None and _windows_scan[0] == devices:
+            return _windows_scan[1]
+
+    import serial.tools.list_ports
+    ports = list(serial.tools.list_ports.comports())
+    ports.sort(key=operator.attrgetter("device"))
+    if devices is not None:
+        _windows_scan = (devices, ports)
+    return ports
+
+
+def _cached_comports(force: bool = False) -> list:
+    """Return _scan_ports(), memoized for PORT_CACHE_TTL."""
+    global _port_cache  # noqa: PLW0603
+    max_age = PORT_CACHE_FORCE_TTL if force else PORT_CACHE_TTL
+    now = time.monotonic()
+    if _port_cache is not None and now - _port_cache[0] < max_age:
+        return _port_cache[1]
+
+    ports = _scan_ports()
+    _port_cache = (now, ports)
+    return ports
+
+
+def _make_label(port) -> str:
+    """Dropdown label for a port: device name, plus description if useful."""
+    if not port.description or port.description == "n/a":
+        return port.device
+    return f"{port.device} – {port.description}"
+
+
 class SerialPortPicker(tk.Tk):
     """Main application window."""
 
     WIDTH = 700
     HEIGHT = 380
     DEFAULT_TCP_PORT = 2217
-
-    def __init__(self, initial_serial_port: str | None = None, initial_tcp_port: int | None = None):
+    LOG_DRAIN_INTERVAL_MS = 50
+    READ_CHUNK_SIZE = 65536
+    PIPE_SIZE = 1024 * 1024
+    PUMP_INTERVAL_MS = 20
+    LOG_MAX_LINES = 5000
+    LOG_TRIM_LINES = 1000
+
+    def __init__(
+        self,
+        initial_serial_port: str | None = None,
+        initial_tcp_port: int | None = None,
+        owns_lock: bool = False,
+    ):
         super().__init__()
         self.title("ESP32 Remote Serial Port Service")
         self.minsize(self.WIDTH, self.HEIGHT)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._selected_port: str | None = None
+        self._ports: list = []
+        # None until the first scan, so an empty first result still shows its message
+        self._combo_values_cache: tuple[str, ...] | None = None
+        self._list_comports = _cached_comports
+        self._reinstalling = False
+        self._reinstall_attempted = False
         self._process: subprocess.Popen | None = None
+        self._output_decoder: io.IncrementalNewlineDecoder | None = None
+        # Windows can't select() on pipes - it uses a reader thread instead
+        self._selector = None if _IS_WINDOWS else selectors.DefaultSelector()
+        self._pump_job: str | None = None
         self._initial_serial_port = initial_serial_port
         self._initial_tcp_port = initial_tcp_port
-        self._locked_tcp_port: int | None = initial_tcp_port
+        # Only remove the lock file on close if we created it
+        self._locked_tcp_port: int | None = initial_tcp_port if owns_lock else None
+        self._log_queue: queue.SimpleQueue[str] = queue.SimpleQueue()
         self._build_ui()
         self._center_window()
-        self._refresh_ports()
-        
-        # Write lock file if we have a specific TCP port to protect
-        if self._locked_tcp_port:
-            write_lock_file(self._locked_tcp_port)
+        # Enumerate ports once the window has painted - can take 100 ms+ on Windows
+        self.after_idle(self._refresh_ports)
+        self._drain_job = self.after(self.LOG_DRAIN_INTERVAL_MS, self._drain_log)
 
     # ── UI construction ──────────────────────────────────────────────
 
     def _build_ui(self):
+        from tkinter import ttk
+
         frame = ttk.Frame(self, padding=20)
         frame.pack(fill="both", expand=True)
 
@@ -172,7 +441,7 @@ class SerialPortPicker(tk.Tk):
         )
         self._combo.grid(row=1, column=0, sticky="we", padx=(0, 8))
 
-        ttk.Button(frame, text="Refresh", command=self._refresh_ports).grid(
+        ttk.Button(frame, text="Refresh", command=lambda: self._refresh_ports(force=True)).grid(
             row=1, column=1, sticky="e"
         )
 
@@ -206,6 +475,7 @@ class SerialPortPicker(tk.Tk):
         self._stop_btn.pack(side="left")
 
         # Row 4 – log output
+        from tkinter import scrolledtext
         self._log = scrolledtext.ScrolledText(
             frame, height=10, width=80, state="disabled", wrap="word",
             font=("Consolas", 9), bg="#1e1e1e", fg="#cccccc",
@@ -219,55 +489,119 @@ class SerialPortPicker(tk.Tk):
     # ── Helpers ──────────────────────────────────────────────────────
 
     def _center_window(self):
-        self.update_idletasks()
+        # Screen size and our fixed WIDTH/HEIGHT need no layout pass
         x = (self.winfo_screenwidth() - self.WIDTH) // 2
         y = (self.winfo_screenheight() - self.HEIGHT) // 2
         self.geometry(f"{self.WIDTH}x{self.HEIGHT}+{x}+{y}")
 
-    def _refresh_ports(self):
+    def _refresh_ports(self, force: bool = False):
         """Re-scan serial ports and populate the dropdown."""
-        import serial.tools.list_ports
-        self._ports = sorted(
-            serial.tools.list_ports.comports(), key=lambda p: p.device
+        try:
+            ports = self._list_comports(force=force)
+        except ImportError as e:
+            self._reinstall_gui_deps(e)
+            return
+
+        # One pass: build labels and find the port to pre-select (if specified)
+        labels = []
+        initial_idx = 0
+        for idx, port in enumerate(ports):
+            labels.append(_make_label(port))
+            if port.device == self._initial_serial_port:
+                initial_idx = idx
+        new_values = tuple(labels)
+
+        # Nothing plugged, unplugged or renamed - keep the dropdown (and selection) as is
+        if new_values == self._combo_values_cache:
+            return
+        self._combo_values_cache = new_values
+        self._ports = ports
+
+        # Direct Tcl call with a tuple skips Tkinter's option-dict handling
+        self._combo.tk.call(self._combo._w, "configure", "-values", new_values)
+
+        if new_values:
+            self._combo.current(initial_idx)
+        else:
+            self._port_var.set("No serial ports detected.")
+
+    def _reinstall_gui_deps(self, error: ImportError):
+        """pyserial vanished after the deps marker was written - drop it and reinstall.
+
+        Only one reinstall is attempted. If pyserial is present but still can't
+        be imported (broken install, or the unrelated PyPI 'serial' package),
+        the error is shown instead of rescanning.
+        """
+        if self._reinstalling:
+            return
+        _unlink_quietly(get_deps_marker_path())
+        missing = missing_dependencies(GUI_REQUIRED, trust_marker=False, record=False)
+        if not missing or self._reinstall_attempted:
+            self._show_dependency_error([f"Failed to import pyserial: {error}"])
+            return
+
+        self._reinstalling = True
+        self._reinstall_attempted = True
+        names = ", ".join(pip for _, pip in missing)
+        self._port_var.set(f"Reinstalling {names} ...")
+        self._log_append(f"ERROR: {error}. Reinstalling {names} ...\n")
+
+        def _done(errors: list[str] | None):
+            self._reinstalling = False
+            if errors is None:
+                errors = ["Dependency installation failed unexpectedly."]
+            if errors:
+                self._show_dependency_error(errors)
+                return
+            self._refresh_ports(force=True)
+
+        run_in_background(
+            self, lambda: ensure_dependencies(GUI_REQUIRED, trust_marker=False), _done
         )
-        labels = [
-            f"{p.device} – {p.description}" if p.description and p.description != "n/a" else p.device
-            for p in self._ports
-        ]
-        self._combo["values"] = labels
-
-        # Try to pre-select the initial port if specified
-        selected = False
-        if self._initial_serial_port and labels:
-            for idx, port in enumerate(self._ports):
-                if port.device == self._initial_serial_port:
-                    self._combo.current(idx)
-                    selected = True
-                    break
-        
-        if not selected:
-            if labels:
-                self._combo.current(0)
-            else:
-                self._port_var.set("No serial ports detected.")
+
+    def _show_dependency_error(self, errors: list[str]):
+        from tkinter import messagebox
+        _unlink_quietly(get_deps_marker_path())  # Don't trust it on the next launch
+        self._port_var.set("No serial ports detected.")
+        self._log_append("ERROR: " + "\n".join(errors) + "\n")
+        messagebox.showerror("Dependency Error", "\n".join(errors))
 
     def _log_append(self, text: str):
-        """Append text to the log widget (thread-safe via after)."""
-        def _append():
+        """Queue text for the log widget (thread-safe, flushed by _drain_log)."""
+        self._log_queue.put(text)
+
+    def _drain_log(self):
+        """Flush all queued log text into the widget in a single insert."""
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
             self._log.configure(state="normal")
-            self._log.insert("end", text)
+            self._log.insert("end", "".join(lines))
+            # Keep the Text widget bounded during long flash/monitor sessions
+            line_count = int(self._log.index("end-1c").split(".")[0])
+            if line_count > self.LOG_MAX_LINES:
+                # Drop the whole overshoot (one batch can add many thousands of
+                # lines) plus LOG_TRIM_LINES of headroom, so we end under the cap
+                drop = line_count - self.LOG_MAX_LINES + self.LOG_TRIM_LINES
+                self._log.delete("1.0", f"{drop + 1}.0")
             self._log.see("end")
             self._log.configure(state="disabled")
-        self.after(0, _append)
+        self._drain_job = self.after(self.LOG_DRAIN_INTERVAL_MS, self._drain_log)
 
     def _on_launch(self):
         idx = self._combo.current()
         if idx < 0 or idx >= len(self._ports):
+            from tkinter import messagebox
             messagebox.showwarning("No port selected", "Please select a serial port first.")
             return
 
         tcp_port = self._tcp_port_var.get().strip()
         if not tcp_port.isdigit():
+            from tkinter import messagebox
             messagebox.showwarning("Invalid TCP port", "TCP port must be a number.")
             return
 
@@ -275,51 +609,170 @@ class SerialPortPicker(tk.Tk):
         self._selected_port = serial_port
 
         cmd = [sys.executable, "-m", "esp_rfc2217_server", "-p", tcp_port, serial_port]
-        self._log_append(f"> {' '.join(cmd)}\n")
+
+        # esptool is only needed by the server - install it on first Start
+        if missing_dependencies(RUNTIME_REQUIRED, trust_marker=False):
+            self._launch_btn.configure(state="disabled")
+            self._log_append(f"Installing {', '.join(RUNTIME_REQUIRED.values())} ...\n")
+            run_in_background(
+                self,
+                lambda: ensure_dependencies(RUNTIME_REQUIRED, verify_import=False, trust_marker=False),
+                lambda errors: self._on_runtime_deps_ready(errors, cmd),
+            )
+            return
+
+        self._start_server(cmd)
+
+    def _on_runtime_deps_ready(self, errors: list[str] | None, cmd: list[str]):
+        if errors is None:
+            errors = ["Dependency installation failed unexpectedly."]
+        if errors:
+            self._log_append("ERROR: " + "\n".join(errors) + "\n")
+            self._launch_btn.configure(state="normal")
+            return
+        self._start_server(cmd)
+
+    def _start_server(self, cmd: list[str]):
+        # Quote like the host shell would, so the echoed command can be copy-pasted
+        shown = subprocess.list2cmdline(cmd) if _IS_WINDOWS else shlex.join(cmd)
+        self._log_append(f"> {shown}\n")
+
+        popen_kwargs = {}
+        if _IS_WINDOWS:
+            # No console window flash; own process group so it can be stopped as a unit
+            popen_kwargs["creationflags"] = (
+                subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        else:
+            # Own session / process group so _on_stop can signal the whole tree
+            popen_kwargs["start_new_session"] = True
+        if _IS_LINUX and sys.version_info >= (3, 10):
+            # Bigger kernel pipe so the server doesn't stall while Tk is busy
+            popen_kwargs["pipesize"] = _linux_pipe_size(self.PIPE_SIZE)
 
         try:
             self._process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
+                bufsize=0,
+                close_fds=True,
+                **popen_kwargs,
             )
         except FileNotFoundError:
             self._log_append("ERROR: esp_rfc2217_server not found. Install esptool:\n")
             self._log_append("  pip install esptool\n")
+            self._launch_btn.configure(state="normal")
             return
 
         self._launch_btn.configure(state="disabled")
         self._stop_btn.configure(state="normal")
 
-        # Read output in a background thread
-        thread = threading.Thread(target=self._read_output, daemon=True)
-        thread.start()
+        # Incremental UTF-8 so multi-byte characters split across reads survive,
+        # plus the same newline handling text-mode pipes would give us
+        self._output_decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True
+        )
+
+        if _IS_WINDOWS:
+            # Anonymous pipes can't be selected on Windows - read in a background thread
+            thread = threading.Thread(target=self._read_output, daemon=True)
+            thread.start()
+        else:
+            # Multiplex the pipe onto the Tk thread via the selector - no reader thread
+            fd = self._process.stdout.fileno()
+            os.set_blocking(fd, False)
+            self._selector.register(fd, selectors.EVENT_READ, self._process)
+            if self._pump_job is None:
+                self._pump_job = self.after(self.PUMP_INTERVAL_MS, self._pump_selector)
+
+    def _feed_output(self, chunk: bytes, final: bool = False):
+        """Decode a block of process output and queue it for the log."""
+        text = self._output_decoder.decode(chunk, final=final)
+        if text:
+            self._log_append(text)
 
     def _read_output(self):
-        """Stream process stdout/stderr into the log widget."""
+        """Stream process stdout/stderr into the log widget (reader thread)."""
         proc = self._process
         if proc is None or proc.stdout is None:
             return
-        for line in proc.stdout:
-            self._log_append(line)
+        fd = proc.stdout.fileno()
+        while True:
+            chunk = os.read(fd, self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self._feed_output(chunk)
+        self._feed_output(b"", final=True)
         proc.wait()
+        self.after(0, self._on_process_exit, proc)
+
+    def _pump_selector(self):
+        """Drain every ready pipe without blocking, then re-arm (POSIX only)."""
+        self._pump_job = None
+        for key, _events in self._selector.select(0):
+            self._drain_pipe(key.fd, key.data)
+        if self._selector.get_map():
+            self._pump_job = self.after(self.PUMP_INTERVAL_MS, self._pump_selector)
+
+    def _drain_pipe(self, fd: int, proc: subprocess.Popen):
+        """Read a non-blocking stdout pipe until it would block or hits EOF."""
+        while True:
+            try:
+                chunk = os.read(fd, self.READ_CHUNK_SIZE)
+            except BlockingIOError:
+                return
+            if not chunk:
+                break
+            self._feed_output(chunk)
+
+        # EOF - the server closed its output and is exiting
+        self._selector.unregister(fd)
+        self._feed_output(b"", final=True)
+        self._wait_for_exit(proc)
+
+    def _wait_for_exit(self, proc: subprocess.Popen):
+        """Poll (without blocking Tk) until proc has exited."""
+        if proc.poll() is None:
+            self.after(self.LOG_DRAIN_INTERVAL_MS, self._wait_for_exit, proc)
+            return
+        self._on_process_exit(proc)
+
+    def _on_process_exit(self, proc: subprocess.Popen):
         self._log_append(f"\n[Process exited with code {proc.returncode}]\n")
-        self.after(0, self._reset_buttons)
+        self._reset_buttons()
 
     def _reset_buttons(self):
         self._launch_btn.configure(state="normal")
         self._stop_btn.configure(state="disabled")
         self._process = None
 
+    def _terminate_process(self):
+        """Ask the server (and anything it spawned) to exit."""
+        proc = self._process
+        if proc is None:
+            return
+        if _IS_WINDOWS:
+            proc.terminate()
+            return
+        try:
+            # start_new_session made the server its own process group leader
+            os.killpg(proc.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass  # Already gone
+
     def _on_stop(self):
         if self._process:
-            self._process.terminate()
+            self._terminate_process()
             self._log_append("\n[Stopping...]\n")
 
     def _on_close(self):
-        if self._process:
-            self._process.terminate()
+        self.after_cancel(self._drain_job)
+        if self._pump_job is not None:
+            self.after_cancel(self._pump_job)
+        if self._selector is not None:
+            self._selector.close()
+        self._terminate_process()
         cleanup_lock_file(self._locked_tcp_port)
         self.destroy()
 
@@ -330,7 +783,6 @@ class SerialPortPicker(tk.Tk):
 
 def launch_detached(serial_port: str | None = None, tcp_port: int | None = None) -> int:
     """Re-launch this script as a detached background process."""
-    system = platform.system()
     script_path = os.path.abspath(__file__)
     
     # Build command with optional port arguments
@@ -344,7 +796,7 @@ def launch_detached(serial_port: str | None = None, tcp_port: int | None = None)
     env = os.environ.copy()
     env["ESP_SERIAL_BRIDGE_DETACHED"] = "1"
     
-    if system == "Windows":
+    if _IS_WINDOWS:
         # Use pythonw to avoid console window
         pythonw = sys.executable.replace("python.exe", "pythonw.exe")
         if not os.path.exists(pythonw):
@@ -354,12 +806,16 @@ def launch_detached(serial_port: str | None = None, tcp_port: int | None = None)
         subprocess.Popen(
             [pythonw] + cmd,
             env=env,
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS,
+            creationflags=(
+                subprocess.CREATE_NEW_PROCESS_GROUP
+                | subprocess.DETACHED_PROCESS
+                | subprocess.CREATE_NO_WINDOW
+            ),
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             stdin=subprocess.DEVNULL,
         )
-    elif system == "Darwin":  # macOS
+    elif _IS_DARWIN:
         # Launch as detached background process (same approach as Linux)
         subprocess.Popen(
             [sys.executable] + cmd,
@@ -386,10 +842,39 @@ def launch_detached(serial_port: str | None = None, tcp_port: int | None = None)
     if tcp_port:
         port_parts.append(f"TCP={tcp_port}")
     port_msg = f" ({', '.join(port_parts)})" if port_parts else ""
-    print(f"Launched ESP32 Remote Serial GUI on {system}{port_msg}")
+    print(f"Launched ESP32 Remote Serial GUI on {_SYSTEM}{port_msg}")
     return 0
 
 
+def install_with_progress(packages: dict[str, str], missing: list[tuple[str, str]]) -> list[str]:
+    """Run ensure_dependencies() in the background behind a progress window.
+
+    missing is the result of the caller's missing_dependencies(packages) probe.
+    """
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.title("ESP32 Remote Serial Port Service")
+    root.resizable(False, False)
+    root.protocol("WM_DELETE_WINDOW", lambda: None)  # Wait for pip to finish
+
+    names = ", ".join(pip for _, pip in missing)
+    ttk.Label(root, text=f"Installing missing dependencies: {names} ...", padding=(20, 20, 20, 8)).pack()
+    progress = ttk.Progressbar(root, mode="indeterminate", length=320)
+    progress.pack(padx=20, pady=(0, 20))
+    progress.start(10)
+
+    errors: list[str] = []
+
+    def _done(result: list[str] | None):
+        errors.extend(result if result is not None else ["Dependency installation failed unexpectedly."])
+        root.destroy()
+
+    run_in_background(root, lambda: ensure_dependencies(packages), _done)
+    root.mainloop()
+    return errors
+
+
 def main() -> int:
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
@@ -422,19 +907,27 @@ def main() -> int:
         return launch_detached(args.serial_port, args.tcp_port)
     
     # Normal GUI launch (only reached by detached child)
-    errors = ensure_dependencies()
+    # Show a window straight away if pip has to run, instead of nothing at all
+    missing = missing_dependencies(GUI_REQUIRED)
+    errors = install_with_progress(GUI_REQUIRED, missing) if missing else []
     if errors:
+        from tkinter import messagebox
         root = tk.Tk()
         root.withdraw()
         messagebox.showerror("Dependency Error", "\n".join(errors))
         root.destroy()
         return 1
 
-    # Import after dependencies are guaranteed present
-    global serial  # noqa: PLW0603
-    import serial.tools.list_ports  # noqa: E402
+    # Take the lock for this TCP port; a parallel launch may have beaten us to it
+    lock = write_lock_file(args.tcp_port) if args.tcp_port else None
+    if lock is False:
+        return 0
 
-    app = SerialPortPicker(initial_serial_port=args.serial_port, initial_tcp_port=args.tcp_port)
+    app = SerialPortPicker(
+        initial_serial_port=args.serial_port,
+        initial_tcp_port=args.tcp_port,
+        owns_lock=lock is True,
+    )
     app.mainloop()
     return 0
 